@@ -1,13 +1,57 @@
 import logging
 import json
+import mmap
 import os
 import re
-import xml.etree.ElementTree as ET
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
 from typing import Dict, Optional, List
+from itertools import repeat
 from pathlib import Path
 
-@dataclass
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    from lxml import etree as ET
+
+    def _xml_parser():
+        return ET.XMLParser(huge_tree=True, collect_ids=False)
+except ImportError:
+    import xml.etree.ElementTree as ET
+
+    def _xml_parser():
+        return None
+
+SOURCE_EXTENSIONS = frozenset({'.c', '.cpp', '.h', '.hpp'})
+# Directory names never descended into while looking for sources
+SKIP_DIRS = frozenset({'build', 'build_ci', 'cmake-build-debug', 'cmake-build-release', 'node_modules'})
+MMAP_MIN_SIZE = 64 * 1024  # Source files at least this large are mmapped rather than read
+
+# Patterns are compiled once per process and shared with pool workers
+# Matches PARAM_DEFINE_<TYPE>(NAME, DEFAULT); and PX4_PARAM_DEFINE_<TYPE>(NAME);
+_RE_ANY_PARAM_DEFINE = re.compile(rb'(?:PX4_)?PARAM_DEFINE_([A-Z_][A-Z0-9_]*)\s*\(\s*([A-Z_][A-Z0-9_]*)(?:\s*,\s*([^ ,\)]+))?\s*\)\s*;')
+
+# With hyperscan installed, a looser superset of the pattern above locates
+# candidate spans and the Python regex only runs on those spans
+if hyperscan is not None:
+    _HS_PARAM_DEFINE_DB = hyperscan.Database()
+    _HS_PARAM_DEFINE_DB.compile(
+        expressions=[rb'(?:PX4_)?PARAM_DEFINE_[A-Z_][A-Z0-9_]*\s*\([^)]*\)\s*;'],
+        ids=[0],
+        flags=[hyperscan.HS_FLAG_SOM_LEFTMOST],
+    )
+else:
+    _HS_PARAM_DEFINE_DB = None
+
+@dataclass(slots=True)
 class ParameterMetadata:
     name: str
     type: str
@@ -25,9 +69,127 @@ class ParameterMetadata:
     source_file: Optional[str] = None  # Track which file defined the parameter
     line_number: Optional[int] = None  # Track line number of definition
 
+def _xml_number_setter(attr: str, convert):
+    """Build a setter for a numeric XML field that leaves attr unset when the element is empty."""
+    def setter(p, e):
+        if e.text and e.text.strip():
+            setattr(p, attr, convert(e.text))
+    return setter
+
+# XML child tag -> setter applying that element to a ParameterMetadata
+_XML_FIELD_SETTERS = {
+    'short_desc': lambda p, e: setattr(p, 'short_desc', e.text),
+    'long_desc': lambda p, e: setattr(p, 'long_desc', e.text),
+    'min': _xml_number_setter('min_val', float),
+    'max': _xml_number_setter('max_val', float),
+    'unit': lambda p, e: setattr(p, 'unit', e.text),
+    'decimal': _xml_number_setter('decimal', int),
+    'values': lambda p, e: setattr(p, 'values', {
+        value.attrib['code']: value.text for value in e if value.tag == 'value'
+    }),
+}
+
+def _count_newlines(content, start: int, end: int) -> int:
+    """Count newlines in content[start:end]."""
+    if isinstance(content, bytes):
+        return content.count(b'\n', start, end)
+    # mmap has no count(); a slice copy counted in C beats iterating matches
+    return content[start:end].count(b'\n')
+
+def _collect_span(pattern_id, start, end, flags, spans):
+    spans.append((start, end))
+
+def _iter_param_defines(content):
+    """Yield _RE_ANY_PARAM_DEFINE matches in content, in file order."""
+    if _HS_PARAM_DEFINE_DB is None:
+        yield from _RE_ANY_PARAM_DEFINE.finditer(content)
+        return
+    spans = []
+    _HS_PARAM_DEFINE_DB.scan(content, match_event_handler=_collect_span, context=spans)
+    for start, end in spans:
+        # Spans start at the leftmost candidate, which may be a stray token
+        # ahead of the real definition, so search rather than match
+        match = _RE_ANY_PARAM_DEFINE.search(content, start, end)
+        if match is not None:
+            yield match
+
+def _scan_source(content, src_path: str, repo_prefix_len: int, definitions: List[tuple]):
+    """Append the parameter definitions found in content to definitions.
+
+    content is either bytes or a read-only mmap. Kept separate from the
+    worker so no match object outlives the mmap it points into.
+    """
+    scan_from = 0
+    # Newlines are counted incrementally between hits, never per line
+    line_number = 1
+    counted_to = 0
+    for match in _iter_param_defines(content):
+        start = match.start()
+        # Ignore definitions that sit inside a comment
+        if content.rfind(b'/*', scan_from, start) > content.rfind(b'*/', scan_from, start):
+            continue
+
+        # Attach the last doc comment between the previous definition and this one
+        comment_lines = []
+        comment_start = content.rfind(b'/**', scan_from, start)
+        if comment_start != -1:
+            comment_end = content.find(b'*/', comment_start, start)
+            if comment_end != -1:
+                comment = content[comment_start + 3:comment_end + 2].decode('utf-8', 'replace')
+                comment_lines = [line.strip() for line in comment.splitlines()]
+
+        line_number += _count_newlines(content, counted_to, start)
+        counted_to = start
+
+        param_type, param_name, param_default = match.groups()
+        if param_default is None:  # PX4_PARAM_DEFINE_* carries no default
+            param_default = b''
+        definitions.append((
+            param_type.decode('ascii'),
+            param_name.decode('ascii'),
+            param_default.decode('utf-8', 'replace'),
+            comment_lines,
+            src_path[repo_prefix_len:],
+            line_number
+        ))
+        scan_from = match.end()
+
+def _parse_source_file_worker(src_path: str, repo_prefix_len: int) -> List[tuple]:
+    """Find parameter definitions in a single source file.
+
+    Runs inside a pool worker, so definitions are returned as plain tuples of
+    _process_parameter_definition arguments to keep pickling cheap. src_path
+    must lie under the repository root whose path is repo_prefix_len - 1
+    characters long.
+    """
+    definitions = []
+    try:
+        with open(src_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return definitions
+            if size < MMAP_MIN_SIZE:
+                content = f.read()
+                # Most sources define no parameters, so bail out before any regex work
+                if b'PARAM_DEFINE_' in content:
+                    _scan_source(content, src_path, repo_prefix_len, definitions)
+            else:
+                # Large files are scanned straight out of the page cache
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                    if content.find(b'PARAM_DEFINE_') != -1:
+                        _scan_source(content, src_path, repo_prefix_len, definitions)
+
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Error parsing source file {src_path}: {str(e)}")
+    return definitions
+
 class PX4ParameterParser:
     def __init__(self, repo_path: Path, output_dir: Optional[Path] = None):
         self.repo_path = repo_path
+        # Source paths are walked from the resolved root, so a file's repo-relative
+        # path is a plain slice past this prefix
+        self._repo_str = str(repo_path.resolve())
+        self._repo_prefix_len = len(self._repo_str) + 1
         # If no output_dir specified, create 'scraped_data' in the same directory as the script
         if output_dir is None:
             self.output_dir = Path(__file__).parent / "scraped_data"
@@ -36,18 +198,10 @@ class PX4ParameterParser:
         self.parameters: Dict[str, ParameterMetadata] = {}
         
         # Configure logging
-        logging.basicConfig(level=logging.DEBUG,
+        logging.basicConfig(level=logging.INFO,
                           format='%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s')
         self.logger = logging.getLogger(__name__)
         
-        # Compile regex patterns for source parsing
-        self.re_comment_start = re.compile(r'\/\*\*')
-        self.re_comment_content = re.compile(r'\*\s*(.*)')
-        self.re_comment_tag = re.compile(r'@([a-zA-Z][a-zA-Z0-9_]*)\s*(.*)')
-        self.re_comment_end = re.compile(r'(.*?)\s*\*\/')
-        self.re_param_define = re.compile(r'PARAM_DEFINE_([A-Z_][A-Z0-9_]*)\s*\(([A-Z_][A-Z0-9_]*)\s*,\s*([^ ,\)]+)\s*\)\s*;')
-        self.re_px4_param_define = re.compile(r'PX4_PARAM_DEFINE_([A-Z_][A-Z0-9_]*)\s*\(([A-Z_][A-Z0-9_]*)\s*\)\s*;')
-        
         self.ensure_output_dir()
 
     def ensure_output_dir(self):
@@ -55,8 +209,12 @@ class PX4ParameterParser:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.logger.info(f"Output directory set to: {self.output_dir}")
         
-    def parse_all(self):
-        """Parse both injected and source parameters"""
+    def parse_all(self, max_workers: Optional[int] = None):
+        """Parse both injected and source parameters.
+
+        Source files are scanned in a process pool of max_workers processes
+        (one per CPU by default); results are merged back in walk order.
+        """
         self.logger.info("Starting parameter parsing")
         
         # Parse the injected parameters first
@@ -67,18 +225,55 @@ class PX4ParameterParser:
             
         # Parse parameters from source files
         self.logger.info("Scanning source files for parameters")
-        for ext in ['.c', '.cpp', '.h', '.hpp']:
-            for src_file in self.repo_path.rglob(f"*{ext}"):
-                if 'build' not in str(src_file):  # Skip build directory
-                    self.parse_source_file(src_file)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(_parse_source_file_worker,
+                                   self._iter_sources(self._repo_str),
+                                   repeat(self._repo_prefix_len),
+                                   chunksize=64)
+            for definitions in results:
+                for definition in definitions:
+                    self._process_parameter_definition(*definition)
             
         # Save the parsed parameters
         self.save_parameters()
             
+    def _iter_sources(self, root: str):
+        """Yield paths of C/C++ sources under root in a single directory walk.
+
+        Symlinked files are followed, but each underlying file is yielded only
+        once however many paths (symlinks, hard links) reach it.
+        """
+        stack = [root]
+        seen = set()
+        while stack:
+            try:
+                it = os.scandir(stack.pop())
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        name = entry.name
+                        # Prune build output and hidden dirs (.git, .github, ...) unvisited
+                        if name not in SKIP_DIRS and not name.startswith('.'):
+                            stack.append(entry.path)
+                    elif entry.is_file():
+                        name = entry.name
+                        if name[name.rfind('.'):] not in SOURCE_EXTENSIONS:
+                            continue
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        key = (st.st_dev, st.st_ino)
+                        if key not in seen:
+                            seen.add(key)
+                            yield entry.path
+
     def parse_xml_file(self, xml_path: Path):
         """Parse a single XML file containing parameter definitions."""
         try:
-            tree = ET.parse(xml_path)
+            tree = ET.parse(str(xml_path), _xml_parser())
             root = tree.getroot()
             
             for group in root.findall('group'):
@@ -88,104 +283,79 @@ class PX4ParameterParser:
                     metadata = self._parse_parameter(param, group_name)
                     if metadata:
                         self.parameters[metadata.name] = metadata
-                        self.logger.debug(f"Parsed parameter from XML: {metadata.name}")
+                        if self.logger.isEnabledFor(logging.DEBUG):
+                            self.logger.debug("Parsed parameter from XML: %s", metadata.name)
         except Exception as e:
             self.logger.error(f"Error parsing {xml_path}: {str(e)}")
 
-    def parse_source_file(self, src_path: Path):
+    def parse_source_file(self, src_path: str):
         """Parse parameters from a source file."""
-        try:
-            with open(src_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # Find all parameter definitions
-            current_comment = []
-            in_comment = False
-            line_number = 0
-            
-            for line in content.split('\n'):
-                line_number += 1
-                line = line.strip()
-                
-                # Handle comment blocks
-                if self.re_comment_start.search(line):
-                    in_comment = True
-                    current_comment = []
-                elif in_comment:
-                    if '*/' in line:
-                        in_comment = False
-                        current_comment.append(line)
-                    else:
-                        current_comment.append(line)
-                elif not in_comment:
-                    # Look for parameter definitions
-                    param_match = self.re_param_define.search(line)
-                    if param_match:
-                        param_type, param_name, param_default = param_match.groups()
-                        self._process_parameter_definition(
-                            param_type, 
-                            param_name, 
-                            param_default, 
-                            current_comment,
-                            src_path.relative_to(self.repo_path),
-                            line_number
-                        )
-                        current_comment = []
-                        
-        except Exception as e:
-            self.logger.error(f"Error parsing source file {src_path}: {str(e)}")
+        # Make the path absolute without following symlinks, so a link keeps its
+        # own location in the repo rather than its target's
+        src_path = os.path.abspath(src_path)
+        if not src_path.startswith(self._repo_str + os.sep):
+            # Reached through an unresolved spelling of the root; rebase it
+            try:
+                rel_path = Path(src_path).relative_to(os.path.abspath(self.repo_path))
+            except ValueError as e:
+                self.logger.error(f"Error parsing source file {src_path}: {str(e)}")
+                return
+            src_path = os.path.join(self._repo_str, rel_path)
+        for definition in _parse_source_file_worker(src_path, self._repo_prefix_len):
+            self._process_parameter_definition(*definition)
 
     def _process_parameter_definition(self, param_type: str, param_name: str, 
                                     param_default: str, comment_lines: List[str],
-                                    source_file: Path, line_number: int):
+                                    source_file: str, line_number: int):
         """Process a parameter definition found in source code."""
         try:
             # Parse comment block
             short_desc = ""
-            long_desc = ""
+            long_desc_parts = []
             metadata = {}
             
             for line in comment_lines:
                 line = line.strip('/* ')
                 
                 # Look for @tags
-                tag_match = self.re_comment_tag.search(line)
-                if tag_match:
-                    tag, value = tag_match.groups()
-                    metadata[tag] = value
+                if line[:1] == '@' and line[1:2].isalpha():
+                    tag_and_value = line[1:].split(None, 1)
+                    metadata[tag_and_value[0]] = tag_and_value[1] if len(tag_and_value) > 1 else ''
                 elif not short_desc:
                     short_desc = line
                 else:
-                    long_desc += line + " "
+                    long_desc_parts.append(line)
+            long_desc = ' '.join(long_desc_parts).strip()
             
-            # Create parameter metadata
-            param = ParameterMetadata(
-                name=param_name,
-                type=param_type,
-                default=param_default,
-                short_desc=short_desc.strip(),
-                long_desc=long_desc.strip(),
-                group=metadata.get('group', 'Uncategorized'),
-                source_file=str(source_file),
-                line_number=line_number
-            )
+            # Gather every field first and construct the metadata in one call
+            kwargs = {
+                'name': param_name,
+                'type': param_type,
+                'default': param_default,
+                'short_desc': short_desc.strip(),
+                'long_desc': long_desc,
+                'group': metadata.get('group', 'Uncategorized'),
+                'source_file': source_file,
+                'line_number': line_number
+            }
             
             # Add optional fields
             if 'min' in metadata:
-                param.min_val = float(metadata['min'])
+                kwargs['min_val'] = float(metadata['min'])
             if 'max' in metadata:
-                param.max_val = float(metadata['max'])
+                kwargs['max_val'] = float(metadata['max'])
             if 'unit' in metadata:
-                param.unit = metadata['unit']
+                kwargs['unit'] = metadata['unit']
             if 'decimal' in metadata:
-                param.decimal = int(metadata['decimal'])
+                kwargs['decimal'] = int(metadata['decimal'])
             if 'volatile' in metadata:
-                param.volatile = True
+                kwargs['volatile'] = True
             if 'category' in metadata:
-                param.category = metadata['category']
+                kwargs['category'] = metadata['category']
                 
-            self.parameters[param_name] = param
-            self.logger.debug(f"Parsed parameter from source: {param_name}")
+            self.parameters[param_name] = ParameterMetadata(**kwargs)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Parsed parameter from source: %s", param_name)
             
         except Exception as e:
             self.logger.error(f"Error processing parameter {param_name}: {str(e)}")
@@ -193,37 +363,27 @@ class PX4ParameterParser:
     def _parse_parameter(self, param_elem: ET.Element, group: str) -> Optional[ParameterMetadata]:
         """Parse a single parameter element from XML."""
         try:
-            name = param_elem.attrib.get('name')
+            # Bind the attribute mapping once; lxml builds a new proxy per access
+            attrib = param_elem.attrib
+            name = attrib.get('name')
             if not name:
                 return None
                 
             metadata = ParameterMetadata(
                 name=name,
-                type=param_elem.attrib.get('type', ''),
-                default=param_elem.attrib.get('default', ''),
-                short_desc=param_elem.find('short_desc').text if param_elem.find('short_desc') is not None else '',
-                long_desc=param_elem.find('long_desc').text if param_elem.find('long_desc') is not None else '',
+                type=attrib.get('type', ''),
+                default=attrib.get('default', ''),
+                short_desc='',
+                long_desc='',
                 group=group,
-                volatile='volatile' in param_elem.attrib and param_elem.attrib['volatile'] == 'true'
+                volatile=attrib.get('volatile') == 'true'
             )
             
-            # Parse optional fields
-            if min_elem := param_elem.find('min'):
-                metadata.min_val = float(min_elem.text)
-            if max_elem := param_elem.find('max'):
-                metadata.max_val = float(max_elem.text)
-            if unit_elem := param_elem.find('unit'):
-                metadata.unit = unit_elem.text
-            if decimal_elem := param_elem.find('decimal'):
-                metadata.decimal = int(decimal_elem.text)
-                
-            # Parse enum values if present
-            values_elem = param_elem.find('values')
-            if values_elem is not None:
-                metadata.values = {
-                    value.attrib['code']: value.text
-                    for value in values_elem.findall('value')
-                }
+            # Visit each child element once, dispatching on its tag
+            for child in param_elem:
+                setter = _XML_FIELD_SETTERS.get(child.tag)
+                if setter is not None:
+                    setter(metadata, child)
                 
             return metadata
         except Exception as e:
@@ -234,31 +394,24 @@ class PX4ParameterParser:
         """Save the parsed parameters to a JSON file."""
         output_file = os.path.join(self.output_dir, "px4_parameters.json")
         
-        # Convert parameters to dictionary format for JSON
-        params_dict = {
-            name: {
-                "name": p.name,
-                "type": p.type,
-                "default": p.default,
-                "short_desc": p.short_desc,
-                "long_desc": p.long_desc,
-                "min_val": p.min_val,
-                "max_val": p.max_val,
-                "unit": p.unit,
-                "decimal": p.decimal,
-                "group": p.group,
-                "values": p.values,
-                "volatile": p.volatile,
-                "category": p.category,
-                "source_file": p.source_file,
-                "line_number": p.line_number
-            }
-            for name, p in self.parameters.items()
-        }
-        
         try:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(params_dict, f, indent=2, ensure_ascii=False)
+            # orjson and json.dump emit the same layout and JSON-equivalent values,
+            # but orjson spells some floats differently (1e-9 vs 1e-09, 0.00001
+            # vs 1e-05), so the file text depends on whether orjson is installed
+            if orjson is not None:
+                # Stream one parameter at a time so the whole document is never
+                # held in memory; nested lines are re-indented to match indent=2
+                with open(output_file, 'wb') as f:
+                    f.write(b'{')
+                    separator = b'\n  '
+                    for name, p in self.parameters.items():
+                        value = orjson.dumps(p, option=orjson.OPT_INDENT_2).replace(b'\n', b'\n  ')
+                        f.write(separator + orjson.dumps(name) + b': ' + value)
+                        separator = b',\n  '
+                    f.write(b'\n}' if self.parameters else b'}')
+            else:
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.parameters, f, indent=2, ensure_ascii=False, default=asdict)
             self.logger.info(f"Successfully saved {len(self.parameters)} parameters to {output_file}")
         except Exception as e:
             self.logger.error(f"Error saving parameters to {output_file}: {str(e)}")
@@ -0,0 +1,39 @@
+import pytest
+
+import px4_scraper
+
+# A stray PARAM_DEFINE_ token with no closing paren ahead of a real definition
+SOURCE = (
+    b'/* PARAM_DEFINE_X (see below */\n'
+    b'/**\n'
+    b' * Gain\n'
+    b' */\n'
+    b'PARAM_DEFINE_INT32(A, 1);\n'
+    b'PX4_PARAM_DEFINE_FLOAT(B);\n'
+)
+
+
+def _spans(matches):
+    return [m.span() for m in matches]
+
+
+def test_hyperscan_prefilter_agrees_with_re():
+    pytest.importorskip('hyperscan')
+    assert px4_scraper._HS_PARAM_DEFINE_DB is not None
+    expected = _spans(px4_scraper._RE_ANY_PARAM_DEFINE.finditer(SOURCE))
+    assert _spans(px4_scraper._iter_param_defines(SOURCE)) == expected
+    assert len(expected) == 2
+
+
+def test_leftmost_span_still_finds_definition(monkeypatch):
+    # Stand-in database reporting one span from the stray token to the real
+    # definition's end, as hyperscan's HS_FLAG_SOM_LEFTMOST does
+    real = SOURCE.index(b'PARAM_DEFINE_INT32')
+    end = SOURCE.index(b';', real) + 1
+
+    class LeftmostDatabase:
+        def scan(self, content, match_event_handler, context):
+            match_event_handler(0, SOURCE.index(b'PARAM_DEFINE_X'), end, 0, context)
+
+    monkeypatch.setattr(px4_scraper, '_HS_PARAM_DEFINE_DB', LeftmostDatabase())
+    assert _spans(px4_scraper._iter_param_defines(SOURCE)) == [(real, end)]